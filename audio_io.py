@@ -0,0 +1,114 @@
+import hashlib
+import io
+
+import numpy as np
+import soundfile as sf
+import streamlit as st
+import torch
+import torchaudio
+from pydub import AudioSegment
+from streamlit_mic_recorder import mic_recorder
+
+SAMPLE_RATE = 16000  # what Whisper and wav2vec2 expect
+
+# --- Decoding ---
+def to_mono_16k(audio, sr):
+    # (frames, channels) float32 -> 16 kHz mono
+    audio = audio.mean(axis=1)
+    if sr != SAMPLE_RATE:
+        audio = torchaudio.functional.resample(torch.from_numpy(audio), sr, SAMPLE_RATE).numpy()
+    return audio
+
+def decode_to_float32(buf):
+    buf.seek(0)
+    audio, sr = sf.read(buf, dtype="float32", always_2d=True)
+    return to_mono_16k(audio, sr)
+
+def audio_key(audio_np):
+    # Compact content hash of the PCM samples, used to key cached transcripts
+    return hashlib.blake2b(audio_np.tobytes(), digest_size=16).hexdigest()
+
+def set_audio(audio_np, source_id=None):
+    # source_id identifies the upload the audio came from, so reruns can skip decoding it again
+    st.session_state.audio_np = audio_np
+    st.session_state.audio_key = None if audio_np is None else audio_key(audio_np)
+    st.session_state.audio_source_id = source_id
+
+def load_upload(uploaded_file):
+    # Decodes straight from the upload bytes; nothing is written to disk
+    upload = io.BytesIO(uploaded_file.getvalue())
+    try:
+        return decode_to_float32(upload)
+    except RuntimeError:
+        # Not readable by libsndfile (e.g. m4a), fall back to ffmpeg via PyDub
+        upload.seek(0)
+        audio_segment = AudioSegment.from_file(upload)
+        audio_segment = audio_segment.set_frame_rate(SAMPLE_RATE).set_channels(1).set_sample_width(2)
+        # PyDub already holds the decoded 16-bit PCM; use it as-is instead of a WAV export + re-decode
+        return np.frombuffer(audio_segment.raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+# --- Input widgets ---
+def audio_input():
+    # Renders the upload / record controls and keeps st.session_state.audio_np (16 kHz mono float32)
+    # and its st.session_state.audio_key hash current
+    if "audio_np" not in st.session_state:
+        set_audio(None)
+
+    st.markdown("---")
+    st.header("1. Choose Audio Input Method")
+
+    audio_source_option = st.radio(
+        "Select input method:",
+        ("Upload Audio File", "Record Live Audio"),
+        key="audio_source_radio"
+    )
+
+    # --- Upload ---
+    if audio_source_option == "Upload Audio File":
+        uploaded_file = st.file_uploader(
+            "Upload an audio file (.mp3, .wav, .m4a, .flac)",
+            type=["mp3", "wav", "m4a", "flac"]
+        )
+
+        if uploaded_file:
+            st.audio(uploaded_file, format=uploaded_file.type)
+            # Decode and hash once per upload; reruns (Process Audio, download buttons) reuse the result
+            if st.session_state.get("audio_source_id") != uploaded_file.file_id:
+                try:
+                    set_audio(load_upload(uploaded_file), source_id=uploaded_file.file_id)
+                except Exception as e:
+                    st.error(f"Error processing uploaded file: {e}. Please ensure FFmpeg is installed and the file is not corrupted.")
+                    set_audio(None) # Reset on error
+            if st.session_state.audio_np is not None:
+                st.success(f"Uploaded audio length: {len(st.session_state.audio_np) / SAMPLE_RATE:.2f} sec")
+
+    # --- Record ---
+    elif audio_source_option == "Record Live Audio":
+        st.info("Click the mic to start/stop recording. Auto stops after 30s.")
+        recorded = mic_recorder(
+            start_prompt="Start Recording",
+            stop_prompt="Stop Recording",
+            just_once=True,
+            use_container_width=True,
+            format="wav",
+            key="mic_recorder"
+        )
+
+        if recorded and 'bytes' in recorded:
+            audio_bytes = recorded['bytes']
+            st.audio(audio_bytes, format="audio/wav")
+
+            try:
+                # Decode once at record time; Process Audio then works on the cached array
+                set_audio(decode_to_float32(io.BytesIO(audio_bytes)))
+                st.success("Audio recorded successfully!")
+            except Exception as e:
+                st.error(f"Error decoding recorded audio: {e}")
+                set_audio(None)
+        elif recorded is None:
+            st.info("No audio recorded yet.")
+        else:
+            st.warning("Recording failed or was empty.")
+            set_audio(None) # Reset on failure
+
+    st.markdown("---")
@@ -0,0 +1,306 @@
+import os
+
+# --- Model cache ---
+# Set before transformers / faster-whisper are imported: huggingface_hub reads HF_HOME at import time
+MODEL_CACHE_DIR = os.environ.get(
+    "MODEL_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache")
+)
+os.environ.setdefault("HF_HOME", os.path.join(MODEL_CACHE_DIR, "huggingface"))
+
+import contextlib
+import gc
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+import onnxruntime
+import torch
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+from transformers import (
+    pipeline, AutoConfig, AutoTokenizer, GenerationConfig,
+    AutoModelForCTC, AutoProcessor, BartForConditionalGeneration
+)
+from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# --- Configuration ---
+WHISPER_BATCH_SIZE = 8  # VAD chunks decoded together per forward pass
+ASR_CHUNK_LENGTH_S = 20
+ASR_STRIDE_LENGTH_S = (5, 5)
+ASR_BATCH_SIZE = 8
+SUMMARY_KWARGS = {
+    "max_length": 150,
+    "min_length": 40,
+    "do_sample": False,
+    "num_beams": 1,  # greedy; the model config would otherwise default to 4-beam search
+    "early_stopping": True,
+    "no_repeat_ngram_size": 3,
+    "length_penalty": 1.0
+}
+SUMMARY_WINDOW_TOKENS = 900  # stays under BART's 1024-token input limit
+SUMMARY_WINDOW_OVERLAP = 100
+SUMMARY_MIN_NEW_TOKENS = 100  # a trailing window adding no more than this is merged into the one before it
+SUMMARY_BATCH_SIZE = 4
+ONNX_CACHE_DIR = os.path.join(MODEL_CACHE_DIR, "onnx")
+ONNX_FILE_NAMES = {
+    "encoder_file_name": "encoder_model.onnx",
+    "decoder_file_name": "decoder_model.onnx",
+    "decoder_with_past_file_name": "decoder_with_past_model.onnx",
+}
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+TORCH_DTYPE = torch.float16 if DEVICE == "cuda" else torch.float32
+WHISPER_COMPUTE_TYPE = "int8_float16" if DEVICE == "cuda" else "int8"
+NUM_THREADS = max(1, (os.cpu_count() or 2) // 2)  # roughly one per physical core
+
+# --- Torch runtime settings ---
+def configure_torch():
+    # Safe to run again (module reload, cache clear): the interop pool can only be sized once,
+    # before first use, so it is skipped when already set
+    torch.set_num_threads(NUM_THREADS)
+    if torch.get_num_interop_threads() != 1:
+        torch.set_num_interop_threads(1)
+    if DEVICE == "cuda":
+        torch.backends.cudnn.benchmark = True
+        # Run compiled modules eagerly instead of failing if a graph can't be compiled
+        torch._dynamo.config.suppress_errors = True
+
+configure_torch()
+
+# --- Cache markers ---
+# A marker is written once a model has been fully downloaded; later loads then skip the Hub
+# (delete MODEL_CACHE_DIR/.ready to force a re-check)
+def _ready_file(model_name):
+    return os.path.join(MODEL_CACHE_DIR, ".ready", model_name.replace("/", "--"))
+
+def is_cached(model_name):
+    return os.path.exists(_ready_file(model_name))
+
+def mark_cached(model_name):
+    if not is_cached(model_name):
+        os.makedirs(os.path.dirname(_ready_file(model_name)), exist_ok=True)
+        open(_ready_file(model_name), "w").close()
+
+# --- Background loading ---
+# Model loads are mostly file I/O and native code that release the GIL, so they overlap well with other work
+_loader_pool = ThreadPoolExecutor(max_workers=2)
+
+def load_in_background(getter, model_name):
+    # Returns a Future; the getter's st.cache_resource still guarantees a single instance.
+    # The caller's script context is attached to the pool thread so the getter's loading spinner renders.
+    ctx = get_script_run_ctx()
+    def load():
+        add_script_run_ctx(ctx=ctx)
+        return getter(model_name)
+    return _loader_pool.submit(load)
+
+def compile_encoder(encoder):
+    # TorchInductor kernel fusion; dynamic shapes since input lengths vary per request.
+    # Compilation is lazy (first forward call); graphs that fail to compile run eagerly
+    # thanks to suppress_errors in configure_torch.
+    return torch.compile(encoder, dynamic=True)
+
+# --- Load Models ---
+@st.cache_resource(show_spinner="Loading Whisper model...")
+def get_whisper(model_name):
+    model = WhisperModel(
+        model_name, device=DEVICE, compute_type=WHISPER_COMPUTE_TYPE, cpu_threads=NUM_THREADS,
+        download_root=os.path.join(MODEL_CACHE_DIR, "whisper"), local_files_only=is_cached(model_name)
+    )
+    mark_cached(model_name)
+    return BatchedInferencePipeline(model=model)
+
+@st.cache_resource(show_spinner="Loading ASR model...")
+def get_wav2vec2(model_name):
+    local_files_only = is_cached(model_name)
+    model = AutoModelForCTC.from_pretrained(
+        model_name, attn_implementation="sdpa", torch_dtype=TORCH_DTYPE, local_files_only=local_files_only
+    ).to(DEVICE)
+    if DEVICE == "cuda":
+        model.wav2vec2.encoder = compile_encoder(model.wav2vec2.encoder)
+    processor = AutoProcessor.from_pretrained(model_name, local_files_only=local_files_only)
+    mark_cached(model_name)
+    # Long audio is sliced into overlapping windows that are batched through the model;
+    # the CTC outputs are stitched back together using the stride overlap.
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        chunk_length_s=ASR_CHUNK_LENGTH_S,
+        stride_length_s=ASR_STRIDE_LENGTH_S,
+        batch_size=ASR_BATCH_SIZE,
+        device=DEVICE
+    )
+
+@st.cache_resource(show_spinner="Loading Summarization model...")
+def get_bart(model_name):
+    local_files_only = is_cached(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, local_files_only=local_files_only)
+    if DEVICE == "cuda":
+        # fp16 weights with fused scaled-dot-product attention kernels
+        model = BartForConditionalGeneration.from_pretrained(
+            model_name, attn_implementation="sdpa", torch_dtype=TORCH_DTYPE, local_files_only=local_files_only
+        ).to(DEVICE)
+        model.model.encoder = compile_encoder(model.model.encoder)
+        mark_cached(model_name)
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+    # CPU: ONNX Runtime with INT8 weights
+    quantized_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--") + "-int8")
+    if not os.path.exists(os.path.join(quantized_dir, "config.json")):
+        # One-time ONNX export + dynamic INT8 quantization, reused on later starts
+        export_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+        ORTModelForSeq2SeqLM.from_pretrained(
+            model_name, export=True, local_files_only=local_files_only
+        ).save_pretrained(export_dir)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        for file_name in ONNX_FILE_NAMES.values():
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+            quantizer.quantize(save_dir=quantized_dir, quantization_config=qconfig)
+        GenerationConfig.from_pretrained(export_dir).save_pretrained(quantized_dir)
+        AutoConfig.from_pretrained(export_dir).save_pretrained(quantized_dir)
+
+    # ONNX Runtime ignores torch.set_num_threads; pin it too so it doesn't oversubscribe the CPU
+    # alongside CTranslate2 when summarizing while transcribing
+    session_options = onnxruntime.SessionOptions()
+    session_options.intra_op_num_threads = NUM_THREADS
+    session_options.inter_op_num_threads = 1
+    ort_model = ORTModelForSeq2SeqLM.from_pretrained(
+        quantized_dir,
+        session_options=session_options,
+        **{key: file_name.replace(".onnx", "_quantized.onnx") for key, file_name in ONNX_FILE_NAMES.items()}
+    )
+    mark_cached(model_name)
+    return pipeline("summarization", model=ort_model, tokenizer=tokenizer)
+
+# --- Inference ---
+# Results are memoized per model and clip, so reruns and repeat clicks skip inference.
+# The raw audio argument is underscored so Streamlit doesn't hash it; audio_key stands in for it.
+@st.cache_data(show_spinner=False)
+def transcribe_whisper(model_name, audio_key, _audio_np, summarizer_model_name=None):
+    # With summarizer_model_name, the transcript is summarized while it is being decoded and
+    # summarize() picks that result up (see _transcribe_and_summarize)
+    if summarizer_model_name:
+        return _transcribe_and_summarize(model_name, summarizer_model_name, _audio_np)
+    return "".join(_whisper_segment_texts(model_name, _audio_np)).strip()
+
+def _whisper_segment_texts(model_name, audio_np):
+    # Audio is split into <=30s speech chunks by VAD and the chunks are decoded as one batch.
+    # CTranslate2 runs outside torch, so there is no autograd state to disable here.
+    # Yields each segment's text as soon as it is decoded.
+    segments, _ = get_whisper(model_name).transcribe(audio_np, batch_size=WHISPER_BATCH_SIZE, beam_size=1)
+    for segment in segments:
+        yield segment.text
+
+@st.cache_data(show_spinner=False)
+def transcribe_wav2vec2(model_name, audio_key, _audio_np):
+    with torch.inference_mode():
+        return get_wav2vec2(model_name)({"array": _audio_np, "sampling_rate": 16000})["text"]
+
+@st.cache_data(show_spinner=False)
+def summarize(model_name, text):
+    rolling_summary = _rolling_summaries.pop((model_name, text), None)
+    if rolling_summary is not None:
+        return rolling_summary.result()
+    with torch.inference_mode():
+        return _summarize(get_bart(model_name), text)
+
+def _summarize(summarizer_pipeline, text):
+    tokenizer = summarizer_pipeline.tokenizer
+    token_ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    if len(token_ids) <= SUMMARY_WINDOW_TOKENS + SUMMARY_MIN_NEW_TOKENS:
+        return summarizer_pipeline(text, truncation=True, **SUMMARY_KWARGS)[0]['summary_text']
+
+    # Too long for one pass: summarize overlapping windows in one batched call,
+    # then summarize the joined window summaries
+    windows = _summary_windows(tokenizer, token_ids)
+    window_summaries = summarizer_pipeline(
+        windows, batch_size=SUMMARY_BATCH_SIZE, truncation=True, **SUMMARY_KWARGS
+    )
+    return _summarize(summarizer_pipeline, " ".join(result['summary_text'] for result in window_summaries))
+
+def _summary_windows(tokenizer, token_ids):
+    # Overlapping token windows decoded back to text. A short trailing remainder is folded into the
+    # last window (at most 900 + 100 tokens, still under 1024) instead of costing its own generate pass.
+    step = SUMMARY_WINDOW_TOKENS - SUMMARY_WINDOW_OVERLAP
+    starts = list(range(0, len(token_ids) - SUMMARY_WINDOW_OVERLAP, step))
+    if len(starts) > 1 and len(token_ids) - starts[-1] - SUMMARY_WINDOW_OVERLAP <= SUMMARY_MIN_NEW_TOKENS:
+        starts.pop()
+    ends = [start + SUMMARY_WINDOW_TOKENS for start in starts[:-1]] + [len(token_ids)]
+    return [tokenizer.decode(token_ids[start:end], skip_special_tokens=True) for start, end in zip(starts, ends)]
+
+# --- Summarize while transcribing ---
+_DONE = object()  # end of transcript; None on the queue means transcription failed
+_rolling_summaries = {}  # (summarizer model, transcript) -> Future of the summary built during transcription
+
+def _transcribe_and_summarize(whisper_model_name, summarizer_model_name, audio_np):
+    # Segments are queued to a consumer thread as Whisper decodes them, so the summary is mostly done
+    # by the time the transcript is. Only runs on a transcript cache miss; the summary's Future is
+    # handed to summarize(), which caches it like any other summary.
+    segment_queue = queue.Queue()
+    # A thread of its own per run, so long transcriptions don't tie up the shared loader pool, with this
+    # run's script context attached so Streamlit calls from it (e.g. the model-loading spinner) work.
+    # Not waited on here: the transcript is returned as soon as Whisper finishes.
+    consumer = ThreadPoolExecutor(
+        max_workers=1, initializer=add_script_run_ctx, initargs=(None, get_script_run_ctx())
+    )
+    summary_future = consumer.submit(_rolling_summary, summarizer_model_name, segment_queue)
+    consumer.shutdown(wait=False)
+
+    texts, finished = [], False
+    try:
+        for text in _whisper_segment_texts(whisper_model_name, audio_np):
+            texts.append(text)
+            segment_queue.put(text)
+        finished = True
+    finally:
+        # Always close the queue, or the consumer would block on it forever
+        segment_queue.put(_DONE if finished else None)
+
+    transcript = "".join(texts).strip()
+    if transcript:
+        _rolling_summaries[(summarizer_model_name, transcript)] = summary_future
+    return transcript
+
+def _rolling_summary(summarizer_model_name, segment_queue):
+    # Consumer side: same windows as _summarize, but each one is summarized as soon as the
+    # transcript has run far enough past it that it can't be merged with the tail
+    summarizer_pipeline = get_bart(summarizer_model_name)
+    tokenizer = summarizer_pipeline.tokenizer
+    step = SUMMARY_WINDOW_TOKENS - SUMMARY_WINDOW_OVERLAP
+    texts, token_ids, window_summaries = [], [], []
+
+    # Own CUDA stream so summarizer kernels can interleave with ASR work on the same GPU
+    stream = torch.cuda.stream(torch.cuda.Stream()) if DEVICE == "cuda" else contextlib.nullcontext()
+    with torch.inference_mode(), stream:
+        while (text := segment_queue.get()) is not _DONE:
+            if text is None:
+                return None
+            texts.append(text)
+            token_ids += tokenizer(text, add_special_tokens=False)["input_ids"]
+            while len(token_ids) > len(window_summaries) * step + SUMMARY_WINDOW_TOKENS + SUMMARY_MIN_NEW_TOKENS:
+                start = len(window_summaries) * step
+                window = tokenizer.decode(token_ids[start:start + SUMMARY_WINDOW_TOKENS], skip_special_tokens=True)
+                window_summaries.append(
+                    summarizer_pipeline(window, truncation=True, **SUMMARY_KWARGS)[0]['summary_text']
+                )
+
+        transcript = "".join(texts).strip()
+        if not window_summaries:
+            # Fits in one window (or nothing was transcribed)
+            return _summarize(summarizer_pipeline, transcript) if transcript else None
+
+        # Windows still open when transcription ended, then the final pass over all window summaries
+        tail = _summary_windows(tokenizer, token_ids)[len(window_summaries):]
+        window_summaries += [
+            result['summary_text'] for result in summarizer_pipeline(
+                tail, batch_size=SUMMARY_BATCH_SIZE, truncation=True, **SUMMARY_KWARGS
+            )
+        ]
+        return _summarize(summarizer_pipeline, " ".join(window_summaries))
+
+def release_memory():
+    # Release cached allocator blocks so an idle app doesn't keep holding VRAM
+    gc.collect()
+    if DEVICE == "cuda":
+        torch.cuda.empty_cache()